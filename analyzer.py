@@ -2,11 +2,14 @@
 
 # Standard imports
 from concurrent.futures import ProcessPoolExecutor
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 import logging
+import math
+import os
 import re
+import sys
 import time
 
 # Third party imports
@@ -15,16 +18,44 @@ import time
 
 
 # Regular expressions for managing USFM and Markdown
-HEADING_REGEX = re.compile(r"^\\h (.*)$")
-CHAPTER_REGEX = re.compile(r"^\\c (.*)$")
-VERSE_REGEX = re.compile(r"^\\v (\d+) (.*)$")
-FOOTNOTE_REGEX = re.compile(r"\\f(.*?)\\f\*")
-USFM_MARKER_REGEX = re.compile(r"\\\w+(\d+)?")
-NUMBER_REGEX = re.compile(r"\d+")
-PUNCTUATION_REGEX = re.compile(r"""[\[\]*+?!()"',.:;—‘’“”¡¿]+""")
-
-
-@dataclass
+#
+# These are compiled once at import.  Worker processes import this module
+# once each, so every pattern is compiled once per worker and reused for all
+# the files that worker handles -- keep any new patterns here rather than
+# compiling them inside process_file.
+
+# Classifies a line as a heading, chapter or verse in a single match attempt
+LINE_REGEX = re.compile(
+    r"^\\(?:h (?P<heading>.*)|c (?P<chapter>.*)|v (?P<verse>\d+) .*)$"
+)
+
+# Footnotes, USFM markers and numbers are blanked out of the verse text in one
+# pass.  Footnotes come first in the alternation so they are removed whole
+# before their inner markers can match.  \d is deliberately Unicode-aware, as
+# some translations use non-ASCII digits.
+NON_TEXT_REGEX = re.compile(r"\\f.*?\\f\*|\\\w+|\d+")
+
+# Words are runs of anything that isn't whitespace or punctuation
+WORD_REGEX = re.compile(r"""[^\s\[\]*+?!()"',.:;—‘’“”¡¿]+""")
+
+# A word to be corrected in the raw file may touch a number or a closing
+# marker, both of which are cleaned out before words are extracted.  It may not
+# follow a backslash, or it would be a marker such as \v itself.
+NON_WORD_START = r"""[^\s\[\]*+?!()"',.:;—‘’“”¡¿\d]"""
+WORD_END = r"""(?![^\s\[\]*+?!()"',.:;—‘’“”¡¿\\\d])"""
+
+
+def whole_word_regex(word: str) -> re.Pattern[str]:
+    """Compile a pattern matching the word where the analyzer would have found
+    it, rather than inside longer words or USFM markers"""
+    # Starting with the word itself lets the regex engine scan for it as a
+    # literal, many times faster than trying a lookbehind at every position.
+    # The lookbehind then checks the character before it.
+    escaped_word = re.escape(word)
+    return re.compile(rf"{escaped_word}(?<!{NON_WORD_START}{escaped_word}){WORD_END}")
+
+
+@dataclass(slots=True)
 class VerseReference:
     """Encapsulates a reference to a verse"""
 
@@ -34,6 +65,14 @@ class VerseReference:
     file_path: Path
     text: str
 
+    # References are hashed every time they're inserted into or merged into a
+    # word's refs, so compute the hash once up front.  (Not frozen because the
+    # text is updated in place after a spelling fix.)
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._hash = hash((self.book, self.chapter, self.verse))
+
     def __str__(self) -> str:
         """Return a string representation of the verse reference, e.g., 'Genesis 1:6'"""
         return f"{self.book} {self.chapter}:{self.verse}"
@@ -49,7 +88,15 @@ class VerseReference:
 
     def __hash__(self) -> int:
         """Implement hash to allow caching and quick lookups"""
-        return hash((self.book, self.chapter, self.verse))
+        return self._hash
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickle without the cached hash, since string hashes are randomized
+        per process and references are sent back from worker processes."""
+        return (
+            VerseReference,
+            (self.book, self.chapter, self.verse, self.file_path, self.text),
+        )
 
 
 @dataclass
@@ -76,6 +123,10 @@ class WordEntry:
     # This is a bit strange, but I can't argue with the results -- the merging
     # process on my laptop went from 90 seconds for a list-based approach to
     # 0.3s (!!) with a dictionary approach.
+    #
+    # A word's count is just len(refs).  The table model reads it once per
+    # load when it builds its rows, so there is no separate count to keep in
+    # sync with the merges.
     refs: dict[VerseReference, None]
 
 
@@ -88,63 +139,53 @@ def process_file(path: Path) -> dict[str, WordEntry]:
     word_entries: dict[str, WordEntry] = {}
 
     current_book: str = ""
-    current_chapter: str = ""
-    current_verse: str = ""
+    current_chapter: Optional[int] = None
+    current_verse: Optional[int] = None
 
+    # Read as text rather than bytes: the word and cleanup regexes rely on
+    # Unicode \s and \d, and several punctuation marks are multi-byte in UTF-8
     with open(path, "r", encoding="utf-8") as infile:
-        for line in infile.readlines():
-
-            # Process heading
-            match = HEADING_REGEX.match(line)
-            if match:
-                current_book = match.group(1)
-                continue
-
-            # Process chapter
-            match = CHAPTER_REGEX.match(line)
-            if match:
-                current_chapter = match.group(1)
-                continue
+        for line in infile:
 
-            # Process verse
-            match = VERSE_REGEX.match(line)
+            # Process heading, chapter or verse
+            match = LINE_REGEX.match(line)
             if match:
-                current_verse = match.group(1)
+                if match.lastgroup == "heading":
+                    current_book = match["heading"]
+                    continue
+                if match.lastgroup == "chapter":
+                    current_chapter = int(match["chapter"])
+                    continue
+                current_verse = int(match["verse"])
 
             # Don't process if we haven't gotten to verses yet
-            if current_chapter == "" or current_verse == "":
+            if current_chapter is None or current_verse is None:
                 continue
 
-            # Clean up non-words
-            line = FOOTNOTE_REGEX.sub(" ", line)
-            line = USFM_MARKER_REGEX.sub(" ", line)
-            line = NUMBER_REGEX.sub(" ", line)
-            text = line
-            line = PUNCTUATION_REGEX.sub(" ", line)
-            line = line.strip()
-            if len(line) == 0:
+            # Clean up non-words and extract words.  (Not memoized: verse lines
+            # are nearly all unique, and the repeats are cheap bare markers.)
+            text = NON_TEXT_REGEX.sub(" ", line)
+            words = WORD_REGEX.findall(text)
+            if not words:
                 continue
 
-            # Extract words
-            words = line.split()
+            # All words on the line share a single reference
+            verse_ref = VerseReference(
+                current_book, current_chapter, current_verse, path, text
+            )
             for word in words:
-                word = word.strip()
-                if len(word) == 0:
-                    continue
-                verse_ref = VerseReference(
-                    current_book, int(current_chapter), int(current_verse), path, text
-                )
-
-                # If new word, create entry for it
-                if word not in word_entries:
-                    word_entry = WordEntry(word, {verse_ref: None})
-                    word_entries[word] = word_entry
-
-                # Otherwise update entry if new ref
+                # If new word, create entry for it.  Interning only here, once
+                # per unique word, means every file a worker merges shares the
+                # same key object without an extra lookup for each occurrence.
+                word_entry = word_entries.get(word)
+                if word_entry is None:
+                    word = sys.intern(word)
+                    word_entries[word] = WordEntry(word, {verse_ref: None})
+
+                # Otherwise add the ref.  Re-adding an existing ref is harmless:
+                # the dictionary keeps the original key and its position.
                 else:
-                    word_entry = word_entries[word]
-                    if verse_ref not in word_entry.refs:
-                        word_entry.refs[verse_ref] = None
+                    word_entry.refs[verse_ref] = None
 
     elapsed = time.time() - begin
     logging.debug(
@@ -156,8 +197,39 @@ def process_file(path: Path) -> dict[str, WordEntry]:
     return word_entries
 
 
-def process_file_or_dir(path: Path) -> dict[str, WordEntry]:  # pragma: no cover
-    """Main function"""
+def merge_word_entries(
+    word_entries: dict[str, WordEntry], other_word_entries: dict[str, WordEntry]
+) -> None:
+    """Merge one set of word entries into another, keeping refs in order"""
+    for other_word_entry in other_word_entries.values():
+        word_entry = word_entries.get(other_word_entry.word)
+        if word_entry is None:
+            word_entries[other_word_entry.word] = other_word_entry
+        else:
+            # Merged in C; new refs are appended, existing ones keep their place.
+            # Updating from another dict grows the table once for the combined
+            # size up front, rather than rehashing repeatedly as keys go in.
+            word_entry.refs.update(other_word_entry.refs)
+
+
+def process_files(
+    paths: list[Path], progress_callback: Optional[Any] = None
+) -> dict[str, WordEntry]:
+    """Process a run of files, merging their word entries in order.  If given,
+    progress_callback.emit(percent, message) is called after each file."""
+    word_entries: dict[str, WordEntry] = {}
+    for count, path in enumerate(paths, start=1):
+        merge_word_entries(word_entries, process_file(path))
+        if progress_callback is not None:
+            progress_callback.emit(count * 100 // len(paths), f"Read {path.name}")
+    return word_entries
+
+
+def process_file_or_dir(
+    path: Path, progress_callback: Optional[Any] = None
+) -> dict[str, WordEntry]:  # pragma: no cover
+    """Main function.  If given, progress_callback.emit(percent, message) is
+    called as files are read."""
 
     word_entries: dict[str, WordEntry] = {}
 
@@ -169,34 +241,51 @@ def process_file_or_dir(path: Path) -> dict[str, WordEntry]:  # pragma: no cover
         logging.error("Unable to process path: %s", path)
         return word_entries
 
-    usfm_files = sorted(list(path.rglob("*.usfm")) + list(path.rglob("*.USFM")))
-
-    # Process files in parallel
-    begin = time.time()
-    with ProcessPoolExecutor() as executor:
-        all_word_entries = list(executor.map(process_file, usfm_files))
-    elapsed = time.time() - begin
-    logging.debug("Finished processing files in %0.2fs", elapsed)
+    # Walk the tree once, matching the extension in any case.  Separate globs
+    # for *.usfm and *.USFM walk it twice, and on case-insensitive file
+    # systems both match every file, so each would be parsed twice.
+    usfm_files = sorted(
+        file_path
+        for file_path in path.rglob("*")
+        if file_path.suffix.lower() == ".usfm" and file_path.is_file()
+    )
 
-    # Collate refs into master list -- has to be sequential because of shared dictionary
+    # With a single CPU (or file) there is nothing to run in parallel, and
+    # pickling every reference back from a worker process would roughly
+    # double the load time, so parse in this process instead
+    cpu_count = os.cpu_count() or 1
+    if cpu_count == 1 or len(usfm_files) <= 1:
+        return process_files(usfm_files, progress_callback)
+
+    # Split the files into contiguous runs, a few per CPU so that a long book
+    # doesn't leave the other workers idle.  Each worker merges its own run
+    # before handing it back, so the first level of the merge happens in
+    # parallel and fewer, smaller results have to be pickled back to us.
+    run_count = cpu_count * 4
+    run_size = max(1, math.ceil(len(usfm_files) / run_count))
+    runs = [
+        usfm_files[index : index + run_size]
+        for index in range(0, len(usfm_files), run_size)
+    ]
+
+    # Process runs in parallel, merging each into the master list as soon as it
+    # comes back so that unpickling and merging overlap with the remaining
+    # parsing.  The merge itself is sequential because of the shared
+    # dictionary, but map() yields runs in file order so refs stay in
+    # canonical order.
     begin = time.time()
-    logging.debug("Start merge of %d word lists", len(all_word_entries))
-    count = 0
-    for file_word_entries in all_word_entries:
-        for file_word_entry in file_word_entries.values():
-            word = file_word_entry.word
-            if word in word_entries:
-                word_entry = word_entries[word]
-                for ref in file_word_entry.refs:
-                    if ref not in word_entry.refs:
-                        word_entry.refs[ref] = None
-            else:
-                word_entries[file_word_entry.word] = file_word_entry
-        count += 1
-        logging.debug("Working, merged %d/%d so far...", count, len(all_word_entries))
+    logging.debug("Start processing %d files in %d runs", len(usfm_files), len(runs))
+    with ProcessPoolExecutor(max_workers=cpu_count) as executor:
+        for count, (run, run_word_entries) in enumerate(
+            zip(runs, executor.map(process_files, runs)), start=1
+        ):
+            merge_word_entries(word_entries, run_word_entries)
+            logging.debug("Working, merged %d/%d so far...", count, len(runs))
+            if progress_callback is not None:
+                progress_callback.emit(count * 100 // len(runs), f"Read {run[-1].name}")
     elapsed = time.time() - begin
     logging.debug(
-        "Finished merge in %0.2fs, total of %d unique words",
+        "Finished processing and merge in %0.2fs, total of %d unique words",
         elapsed,
         len(word_entries),
     )
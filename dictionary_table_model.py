@@ -1,7 +1,8 @@
 """ Maps a dictionary of WordEntries to back a table. """
 
 # Standard imports
-from typing import Any, Optional
+from operator import itemgetter
+from typing import Any, Iterable, Optional
 
 # Third party imports
 from PySide6.QtCore import (
@@ -14,6 +15,15 @@ from PySide6.QtCore import (
 # Project imports
 from analyzer import WordEntry
 
+# Qt passes roles to data() as plain ints, and comparing an int against the
+# enum member goes through the enum's __eq__, several times slower than an int
+# comparison.  data() runs for every role of every visible cell on each paint.
+DISPLAY_ROLE = int(Qt.ItemDataRole.DisplayRole)
+
+# Rows are handed to the view this many at a time as it scrolls, so a large
+# word list doesn't have to be laid out and filtered in full before it appears
+FETCH_SIZE = 200
+
 
 class DictionaryTableModel(QAbstractTableModel):
     """Provides a data model that maps WordEntries to a table"""
@@ -21,15 +31,80 @@ class DictionaryTableModel(QAbstractTableModel):
     def __init__(self, data_dict: dict[str, WordEntry]):
         super().__init__()
         self.data_dict = data_dict
-        self.keys = list(self.data_dict.keys())
+        self.rows = self.build_rows(data_dict)
         self.columns = ["Word", "Count"]
 
+        # Number of rows the view has been told about so far
+        self.loaded_row_count = min(FETCH_SIZE, len(self.rows))
+
+        # Current sort, re-applied whenever the data is replaced
+        self.sort_column = -1
+        self.sort_order = Qt.SortOrder.AscendingOrder
+
+    @staticmethod
+    def build_rows(data_dict: dict[str, WordEntry]) -> list[tuple[str, int, str]]:
+        """Build one (word, count, lowercase word) tuple per row, so painting,
+        sorting and filtering a cell is a list index rather than a dictionary
+        lookup, len() or lower() call"""
+        return [(key, len(entry.refs), key.lower()) for key, entry in data_dict.items()]
+
+    def word(self, row: int) -> str:
+        """Return the word on a row, without going through index() and data()"""
+        return self.rows[row][0]
+
+    def set_data(self, data_dict: dict[str, WordEntry]) -> None:
+        """Replace the data in place, so views and proxies keep using this model"""
+        self.beginResetModel()
+        self.data_dict = data_dict
+        self.rows = self.build_rows(data_dict)
+        # New rows are already in the original order, so only sort by a column
+        if self.sort_column >= 0:
+            self.rows = self.sorted_rows()
+        self.loaded_row_count = min(FETCH_SIZE, len(self.rows))
+        self.endResetModel()
+
+    def sorted_rows(self) -> list[tuple[str, int, str]]:
+        """Return the rows sorted by the current sort column and order"""
+        if self.sort_column < 0:
+            # No sort column means the original order
+            return self.build_rows(self.data_dict)
+        return sorted(
+            self.rows,
+            key=itemgetter(self.sort_column),
+            reverse=self.sort_order == Qt.SortOrder.DescendingOrder,
+        )
+
     # pylint: disable=unused-argument
     def rowCount(
         self,
         parent: Optional[QModelIndex | QPersistentModelIndex] = None,
     ) -> int:
-        return len(self.data_dict)
+        if parent is not None and parent.isValid():
+            return 0
+        return self.loaded_row_count
+
+    def canFetchMore(self, parent: QModelIndex | QPersistentModelIndex) -> bool:
+        if parent.isValid():
+            return False
+        return self.loaded_row_count < len(self.rows)
+
+    def fetchMore(self, parent: QModelIndex | QPersistentModelIndex) -> None:
+        if parent.isValid():
+            return
+        self.fetch_rows(self.loaded_row_count + FETCH_SIZE)
+
+    def fetch_all(self) -> None:
+        """Hand every remaining row to the view, e.g. before filtering"""
+        self.fetch_rows(len(self.rows))
+
+    def fetch_rows(self, row_count: int) -> None:
+        """Extend the rows the view knows about to the given count"""
+        row_count = min(row_count, len(self.rows))
+        if row_count <= self.loaded_row_count:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded_row_count, row_count - 1)
+        self.loaded_row_count = row_count
+        self.endInsertRows()
 
     # pylint: disable=unused-argument
     def columnCount(
@@ -43,13 +118,13 @@ class DictionaryTableModel(QAbstractTableModel):
         index: QModelIndex | QPersistentModelIndex,
         role: int = Qt.ItemDataRole.DisplayRole,
     ) -> Any:
-        if role == Qt.ItemDataRole.DisplayRole:
-            key = self.keys[index.row()]
-            if index.column() == 0:  # First column displays keys
-                return key
-            if index.column() == 1:  # Second column displays values
-                return len(self.data_dict[key].refs)
-        return None
+        # Qt asks for every role (font, colors, alignment...) of every visible
+        # cell on each paint, so get the roles we don't supply out of the way
+        if role != DISPLAY_ROLE:
+            return None
+
+        # First column displays keys, second displays counts
+        return self.rows[index.row()][index.column()]
 
     def headerData(
         self,
@@ -57,8 +132,43 @@ class DictionaryTableModel(QAbstractTableModel):
         orientation: Qt.Orientation,
         role: int = Qt.ItemDataRole.DisplayRole,
     ) -> Any:
-        if role == Qt.ItemDataRole.DisplayRole:
+        if role == DISPLAY_ROLE:
             if orientation == Qt.Orientation.Horizontal:
                 return self.columns[section]
             return str(section)
         return None
+
+    def sort(
+        self,
+        column: int,
+        order: Qt.SortOrder = Qt.SortOrder.AscendingOrder,
+        keep_words: Iterable[str] = (),
+    ) -> None:
+        """Sort the rows with a single Python sort.  Persistent indexes (e.g.
+        the selection) follow their words, and so do those a proxy will make
+        for keep_words once the layout starts changing."""
+        self.sort_column = column
+        self.sort_order = order
+        rows = self.sorted_rows()
+        new_rows = {row_data[0]: row for row, row_data in enumerate(rows)}
+
+        # A word can sort past the rows fetched so far, so fetch up to it
+        # rather than losing its index.  Rows can't be inserted once the
+        # layout change has begun, so this is done first.
+        words = [self.rows[index.row()][0] for index in self.persistentIndexList()]
+        words.extend(keep_words)
+        if words:
+            self.fetch_rows(max(new_rows[word] for word in words) + 1)
+
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        moved_rows = [new_rows[self.rows[index.row()][0]] for index in old_indexes]
+        self.rows = rows
+        self.changePersistentIndexList(
+            old_indexes,
+            [
+                self.index(row, index.column())
+                for row, index in zip(moved_rows, old_indexes)
+            ],
+        )
+        self.layoutChanged.emit()
@@ -1,14 +1,19 @@
 """ Table filter model that allows filtering the word text """
 
 # Standard imports
+from typing import cast
 
 # Third party imports
 from PySide6.QtCore import (
+    Qt,
     QModelIndex,
     QPersistentModelIndex,
     QSortFilterProxyModel,
 )
 
+# Project imports
+from dictionary_table_model import DictionaryTableModel
+
 
 class FilterProxyModel(QSortFilterProxyModel):
     """Model for filtering the table"""
@@ -19,15 +24,43 @@ class FilterProxyModel(QSortFilterProxyModel):
 
     def set_filter_text(self, text: str) -> None:
         """Set the filter text"""
-        self.filter_text = text.lower()
-        # Triggers the filter to be reapplied
-        self.invalidateFilter()
+        # Filtering is case insensitive, so e.g. capitalizing the filter
+        # doesn't need every row checked again
+        filter_text = text.lower()
+        if filter_text == self.filter_text:
+            return
+        self.filter_text = filter_text
+        # Matches may be in rows the view hasn't scrolled to yet
+        if self.filter_text:
+            cast(DictionaryTableModel, self.sourceModel()).fetch_all()
+        # Triggers the filter to be reapplied.  Only rows are filtered, so
+        # the columns don't need to be checked again.
+        self.invalidateRowsFilter()
 
     # Override the filterAcceptsRow method to filter based on column 1
+    # pylint: disable=unused-argument
     def filterAcceptsRow(
         self, source_row: int, source_parent: QModelIndex | QPersistentModelIndex
     ) -> bool:
         """Filter out rows that don't match filter"""
-        index = self.sourceModel().index(source_row, 0, source_parent)  # Column 1
-        column_text = str(self.sourceModel().data(index)).lower()
-        return self.filter_text in column_text
+        # Use the source model's cached lowercase word rather than going through
+        # index() and data() and lowercasing it again on every keystroke
+        source_model = cast(DictionaryTableModel, self.sourceModel())
+        return self.filter_text in source_model.rows[source_row][2]
+
+    def sort(
+        self,
+        column: int,
+        order: Qt.SortOrder = Qt.SortOrder.AscendingOrder,
+    ) -> None:
+        """Sort the source model instead of the proxy.  The proxy's own sort
+        calls back into the source model's data() for every comparison."""
+        # The view's selection is held here, and only reaches the source model
+        # once its layout starts changing, too late to fetch the rows it sorts to
+        source_model = cast(DictionaryTableModel, self.sourceModel())
+        keep_words = [
+            source_model.word(self.mapToSource(QModelIndex(index)).row())
+            for index in self.persistentIndexList()
+            if index.isValid()
+        ]
+        source_model.sort(column, order, keep_words)
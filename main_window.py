@@ -4,9 +4,15 @@
 # Standard imports
 #
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
+import csv
+import html
 import logging
-from typing import cast, Any, Tuple
+import re
+from typing import Any, Optional, Tuple
 
 #
 # Third party imports
@@ -22,6 +28,7 @@ from pygit2 import (
     GitError,
 )
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QFileDialog,
     QInputDialog,
     QMainWindow,
@@ -37,11 +44,13 @@ from PySide6.QtWidgets import (
     QDockWidget,
     QHeaderView,
 )
-from PySide6.QtGui import QIcon
+from PySide6.QtGui import QIcon, QTextCursor
 from PySide6.QtCore import (
     Qt,
     QModelIndex,
+    QSignalBlocker,
     QThreadPool,
+    QTimer,
 )
 
 #
@@ -52,12 +61,52 @@ from analyzer import WordEntry
 from dictionary_table_model import DictionaryTableModel
 from filter_proxy_model import FilterProxyModel
 import analyzer
-from worker import Worker
+from worker import ThrottledProgress, Worker
 from settings import Settings
 
+# References are added to the display this many at a time as the user scrolls
+REFS_PAGE_SIZE = 200
+
+# Number of words whose reference HTML is kept for when they're shown again
+REFS_CACHE_SIZE = 256
+
+# Characters that have to be escaped in reference text shown as HTML
+HTML_SPECIAL_REGEX = re.compile(r"[&<>]")
+
+
+class PushCallbacks(RemoteCallbacks):
+    """Supplies credentials for a push, and records refs the server rejects"""
+
+    def __init__(self, credentials: UserPass) -> None:
+        super().__init__(credentials=credentials)
+        self.rejections: list[str] = []
+
+    def push_update_reference(self, refname: str, message: Optional[str]) -> None:
+        """Called for each ref pushed, with a message if the server rejected it"""
+        if message:
+            self.rejections.append(f"{refname}: {message}")
+
+
+def correct_file(
+    file_path: Path, word_regex: re.Pattern[str], replacement: str
+) -> bool:
+    """Correct a word throughout a USFM file, returning whether it changed"""
+    # Text rather than bytes, as the word boundaries need Unicode whitespace
+    # and multi-byte punctuation, the same as the analyzer
+    uncorrected_text = file_path.read_text(encoding="utf-8")
+    corrected_text = word_regex.sub(replacement, uncorrected_text)
+
+    # Don't rewrite files with nothing to change, e.g. when the word was
+    # already corrected there, so they aren't touched or marked dirty
+    if corrected_text == uncorrected_text:
+        return False
+    file_path.write_text(corrected_text, encoding="utf-8")
+    return True
+
 
 class MainWindow(QMainWindow):
-    # pylint: disable=too-many-instance-attributes, too-many-locals
+    # pylint: disable=too-many-instance-attributes, too-many-locals, too-many-statements
+    # pylint: disable=too-many-public-methods
     """Main Window"""
 
     def __init__(self, app_settings: Settings) -> None:
@@ -71,13 +120,28 @@ class MainWindow(QMainWindow):
         self.settings = app_settings
         self.wacs_password = ""
 
-        # Threading
+        # Threading.  Loading and pushing can take a long time, so they get
+        # their own threads, and a slow push doesn't hold up spelling fixes
+        # and exports (the default pool may only have one thread).
         self.threadpool = QThreadPool()
+        self.io_pool = QThreadPool(self)
+        self.io_pool.setMaxThreadCount(2)
 
         # Data
         self.path = Path(self.settings.repo_dir)
         self.word_entries: dict[str, analyzer.WordEntry] = {}
 
+        # Files spelling fixes have changed since the last commit
+        self.dirty_paths: set[Path] = set()
+
+        # Reference HTML of the words most recently shown, one string per
+        # reference, so clicking a word again doesn't rebuild it
+        self.refs_html: OrderedDict[str, list[str]] = OrderedDict()
+
+        # Word whose references are currently displayed, and how many of them
+        self.shown_word = ""
+        self.shown_ref_count = 0
+
         # Load USFM button
         self.load_usfm_button = QPushButton("Load USFM")
         self.load_usfm_button.clicked.connect(self.on_load_usfm_clicked)
@@ -90,12 +154,28 @@ class MainWindow(QMainWindow):
         )
         filter_field.textChanged.connect(self.on_filter_changed)
 
-        # Table of words
-        table_model = DictionaryTableModel({})
+        # Filtering runs once typing pauses, rather than for every keystroke
+        self.filter_text = ""
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(150)
+        self.filter_timer.timeout.connect(self.on_filter_timeout)
+
+        # Table of words.  The models are created once and reused for every
+        # load, so the view doesn't tear down and rebuild its internals.
+        self.table_model = DictionaryTableModel({})
+        self.proxy_table_model = FilterProxyModel()
+        self.proxy_table_model.setSourceModel(self.table_model)
         self.table_view = QTableView()
-        self.table_view.setModel(table_model)
+        self.table_view.setModel(self.proxy_table_model)
         self.table_view.setSortingEnabled(True)
+        self.table_view.sortByColumn(1, Qt.SortOrder.DescendingOrder)
         self.table_view.verticalHeader().setVisible(False)
+        # Clicking any cell selects its whole row, without a second selection
+        # change from the click handler
+        self.table_view.setSelectionBehavior(
+            QAbstractItemView.SelectionBehavior.SelectRows
+        )
         self.table_view.setSizePolicy(
             QSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         )
@@ -107,14 +187,20 @@ class MainWindow(QMainWindow):
         # List of references
         self.references = QTextEdit()
         self.references.setReadOnly(True)
+        # Pages of references are inserted through a cursor, and each insert
+        # would otherwise record undo steps for every fragment of its HTML
+        self.references.setUndoRedoEnabled(False)
+        self.references.verticalScrollBar().valueChanged.connect(
+            self.on_references_scrolled
+        )
 
         # Fix Spelling button
-        fix_spelling_button = QPushButton("Fix Spelling")
-        fix_spelling_button.clicked.connect(self.on_fix_spelling_clicked)
+        self.fix_spelling_button = QPushButton("Fix Spelling")
+        self.fix_spelling_button.clicked.connect(self.on_fix_spelling_clicked)
 
         # Push Changes button
-        push_changes_button = QPushButton("Push changes")
-        push_changes_button.clicked.connect(self.on_push_changes_clicked)
+        self.push_changes_button = QPushButton("Push changes")
+        self.push_changes_button.clicked.connect(self.on_push_changes_clicked)
 
         # Export Word List button
         self.export_wordlist_button = QPushButton("Export word list")
@@ -126,8 +212,8 @@ class MainWindow(QMainWindow):
         left_pane_layout.addWidget(self.load_usfm_button)
         left_pane_layout.addWidget(filter_field)
         left_pane_layout.addWidget(self.table_view)
-        left_pane_layout.addWidget(fix_spelling_button)
-        left_pane_layout.addWidget(push_changes_button)
+        left_pane_layout.addWidget(self.fix_spelling_button)
+        left_pane_layout.addWidget(self.push_changes_button)
         left_pane_layout.addWidget(self.export_wordlist_button)
 
         # Status bar
@@ -167,23 +253,31 @@ class MainWindow(QMainWindow):
         worker = Worker(self.worker_parse_usfm, self.path)
         worker.signals.progress.connect(self.on_worker_progress_update)
         worker.signals.result.connect(self.on_load_usfm_complete)
-        self.threadpool.start(worker)
+        worker.signals.error.connect(self.on_worker_error)
+        worker.signals.finished.connect(self.on_load_usfm_finished)
+
+        # Parsing runs off the main thread, so don't let another load start
+        # until it's done
+        self.load_usfm_button.setEnabled(False)
+        self.io_pool.start(worker)
         self.update_status_bar("Reading USFM files...")
 
+    def on_load_usfm_finished(self) -> None:
+        """Called back on the main thread after USFM parsing ends, even on error."""
+        self.load_usfm_button.setEnabled(True)
+
     def on_load_usfm_complete(self, word_entries: dict[str, WordEntry]) -> None:
         """Called back on the main thread after USFM parsing is complete."""
 
         # Remember word entries for later
         self.word_entries = word_entries
+        self.refs_html.clear()
+        self.shown_word = ""
 
-        # Update data model
-        table_model = DictionaryTableModel(word_entries)
-        proxy_table_model = FilterProxyModel()
-        proxy_table_model.setSourceModel(table_model)
-        proxy_table_model.sort(1, order=Qt.SortOrder.DescendingOrder)
-
-        # Attach data model to table
-        self.table_view.setModel(proxy_table_model)
+        # Update data model in place.  It keeps the current sort (most frequent
+        # words first, unless the user has clicked a header) and applies it
+        # to the new rows before the view sees them.
+        self.table_model.set_data(word_entries)
 
         # Enable export wordlist button
         self.export_wordlist_button.setEnabled(True)
@@ -193,14 +287,21 @@ class MainWindow(QMainWindow):
 
     def on_filter_changed(self, text: str) -> None:
         """When the user changes the word filter."""
-        proxy_table_model = cast(FilterProxyModel, self.table_view.model())
-        proxy_table_model.set_filter_text(text)
+        # Restarting the timer pushes the filter back until typing pauses
+        self.filter_text = text
+        self.filter_timer.start()
+
+    def on_filter_timeout(self) -> None:
+        """When the user has stopped typing in the word filter."""
+        self.proxy_table_model.set_filter_text(self.filter_text)
 
     def on_table_cell_clicked(self, index: QModelIndex) -> None:
         """When the user clicks a cell, show its references"""
-        row = index.row()
-        word = self.table_view.model().index(row, 0).data()
-        self.table_view.selectRow(row)
+        word = self.table_model.word(self.proxy_table_model.mapToSource(index).row())
+
+        # Clicking another cell of the word already shown changes nothing
+        if word == self.shown_word:
+            return
         word_entry = self.word_entries[word]
         self.build_refs(word_entry)
 
@@ -222,8 +323,8 @@ class MainWindow(QMainWindow):
             )
             error_dialog.setFixedSize(500, 200)
             return
-        row = selected_indexes[0].row()
-        word = self.table_view.model().index(row, 0).data()
+        source_index = self.proxy_table_model.mapToSource(selected_indexes[0])
+        word = self.table_model.word(source_index.row())
         corrected_spelling, ok = QInputDialog.getText(
             self,
             "Correct Spelling",
@@ -235,8 +336,14 @@ class MainWindow(QMainWindow):
 
         # Fix in UI
         word_entry = self.word_entries[word]
+        word_regex = analyzer.whole_word_regex(word)
+        replacement = corrected_spelling.replace("\\", "\\\\")
         for ref in word_entry.refs:
-            ref.text = ref.text.replace(word, corrected_spelling)
+            ref.text = word_regex.sub(replacement, ref.text)
+
+        # Every word on a corrected line shares its reference, and so its new
+        # text, so any cached HTML could now be stale
+        self.refs_html.clear()
         self.build_refs(word_entry)
 
         # Launch worker to fix USFM files
@@ -244,17 +351,33 @@ class MainWindow(QMainWindow):
             self.worker_fix_spelling, word=word, corrected_spelling=corrected_spelling
         )
         worker.signals.progress.connect(self.on_worker_progress_update)
+        worker.signals.result.connect(self.on_fix_spelling_complete)
         worker.signals.error.connect(self.on_worker_error)
+        worker.signals.finished.connect(self.on_fix_spelling_finished)
+
+        # One fix at a time, so two workers never rewrite the same file from
+        # stale copies of it
+        self.fix_spelling_button.setEnabled(False)
         self.threadpool.start(worker)
 
-    def worker_fix_spelling(self, *args: Any, **kwargs: Any) -> None:
-        # pylint: disable=unused-argument
-        """Correct spelling in USFM files."""
+    def on_fix_spelling_complete(self, corrected_paths: list[Path]) -> None:
+        """Called back on the main thread after the USFM files are corrected."""
+        # Recorded here rather than by the worker, so the set the push worker
+        # stages from is only ever changed on the main thread
+        self.dirty_paths.update(corrected_paths)
 
-        # Setup
-        progress_callback = kwargs["progress_callback"]
-        word: str = kwargs["word"]
-        corrected_spelling: str = kwargs["corrected_spelling"]
+    def on_fix_spelling_finished(self) -> None:
+        """Called back on the main thread after correcting ends, even on error."""
+        self.fix_spelling_button.setEnabled(True)
+
+    def worker_fix_spelling(
+        self, word: str, corrected_spelling: str, *, progress_callback: Any
+    ) -> list[Path]:
+        """Correct spelling in USFM files, returning the files changed."""
+
+        # Setup.  Progress is reported per file, so only pass it on when the
+        # percentage moves.
+        file_progress = ThrottledProgress(progress_callback)
         logging.debug("Correcting spelling of %s to %s...", word, corrected_spelling)
 
         # Get refs for word
@@ -263,49 +386,124 @@ class MainWindow(QMainWindow):
             message = f"ERROR: Couldn't find word entry for {word}!"
             logging.error(message)
             progress_callback.emit(100, message)
-            return
-
-        # Count files to be corrected
-        files_to_be_corrected = []
-        for ref in word_entry.refs:
-            # Don't correct the same file more than once
-            if ref.file_path in files_to_be_corrected:
-                continue
-            files_to_be_corrected.append(ref.file_path)
-
-        # Correct USFM files
-        files_corrected = []
-        for ref in word_entry.refs:
-            # Don't correct the same file more than once
-            if ref.file_path in files_corrected:
-                continue
-            files_corrected.append(ref.file_path)
-            uncorrected_text = ref.file_path.read_text(encoding="utf-8")
-            corrected_text = uncorrected_text.replace(word, corrected_spelling)
-            with open(ref.file_path, "w", encoding="utf-8") as file:
-                file.write(corrected_text)
-                percent_done = int(
-                    float(len(files_corrected))
-                    / float(len(files_to_be_corrected))
-                    * 100.0
+            return []
+
+        # Each file only needs correcting once, however many refs it has.  The
+        # dictionary keeps the files unique and in canonical order.
+        file_paths = list(dict.fromkeys(ref.file_path for ref in word_entry.refs))
+
+        # Correct USFM files.  Only whole words are replaced, so correcting
+        # e.g. "the" leaves "other" and the \th marker alone.
+        word_regex = analyzer.whole_word_regex(word)
+        replacement = corrected_spelling.replace("\\", "\\\\")
+        corrected_paths: list[Path] = []
+        failed_paths: list[Path] = []
+
+        # Files are read and written on a few threads, so one file's disk I/O
+        # overlaps with another's substitution.  Every file is submitted up
+        # front, so each one's outcome is collected, in file order, even if
+        # another file fails; otherwise files rewritten after a failure would
+        # go unreported.
+        with ThreadPoolExecutor() as executor:
+            corrections = [
+                executor.submit(
+                    correct_file,
+                    file_path,
+                    word_regex=word_regex,
+                    replacement=replacement,
                 )
-                message = f"Corrected {ref.file_path.name}"
-                logging.debug(message)
-                progress_callback.emit(percent_done, message)
+                for file_path in file_paths
+            ]
+            for count, (file_path, correction) in enumerate(
+                zip(file_paths, corrections), start=1
+            ):
+                try:
+                    corrected = correction.result()
+                except (OSError, ValueError) as error:
+                    # e.g. a file that's read-only or isn't valid UTF-8
+                    message = f"Failed to correct {file_path.name}: {error}"
+                    logging.error(message)
+                    failed_paths.append(file_path)
+                else:
+                    if corrected:
+                        corrected_paths.append(file_path)
+                        message = f"Corrected {file_path.name}"
+                    else:
+                        message = f"Nothing to correct in {file_path.name}"
+                    logging.debug(message)
+                percent_done = int(float(count) / float(len(file_paths)) * 100.0)
+                file_progress.emit(percent_done, message)
+
+        # The files that did change are still returned to be marked dirty.
+        # Failures are summed up last, unthrottled, so they aren't hidden
+        # by later progress.
+        if failed_paths:
+            names = ", ".join(file_path.name for file_path in failed_paths)
+            progress_callback.emit(100, f"ERROR: Failed to correct {names}")
+        return corrected_paths
 
     def build_refs(self, word_entry: WordEntry) -> None:
         """Build HTML reference text display."""
-        html_refs = []
-        for ref in word_entry.refs:
-            highlighted_text = ref.text.replace(
-                word_entry.word, f"<font color='red'>{word_entry.word}</font>"
-            )
-            text = (
-                f"<h4>{ref.book} {ref.chapter}:{ref.verse}</h4>"
-                f"<p>{highlighted_text}</p>"
-            )
-            html_refs.append(text)
-        self.references.setHtml("".join(html_refs))
+        if word_entry.word in self.refs_html:
+            self.refs_html.move_to_end(word_entry.word)
+        else:
+            # Highlight the same whole-word matches a spelling fix would change.
+            # Most verses have nothing to escape, so the word is highlighted
+            # with one substitution.  Otherwise every match is the word itself,
+            # so the text between matches is escaped and joined with the word,
+            # escaped once, rather than escaping the text first and letting
+            # the word match inside an entity such as &amp;.
+            word_regex = analyzer.whole_word_regex(word_entry.word)
+            highlight = f"<font color='red'>{html.escape(word_entry.word)}</font>"
+            highlight_replacement = highlight.replace("\\", "\\\\")
+            refs_html = []
+            for ref in word_entry.refs:
+                if HTML_SPECIAL_REGEX.search(ref.text):
+                    text = highlight.join(
+                        html.escape(part, quote=False)
+                        for part in word_regex.split(ref.text)
+                    )
+                else:
+                    text = word_regex.sub(highlight_replacement, ref.text)
+                refs_html.append(
+                    f"<h4>{html.escape(ref.book)} {ref.chapter}:{ref.verse}</h4>"
+                    f"<p>{text}</p>"
+                )
+            self.refs_html[word_entry.word] = refs_html
+            # Frequent words have megabytes of HTML, so forget the words
+            # least recently shown
+            if len(self.refs_html) > REFS_CACHE_SIZE:
+                self.refs_html.popitem(last=False)
+
+        # Laying out rich text is by far the slowest part of showing a word, so
+        # only the first page of references is shown until the user scrolls
+        self.shown_word = word_entry.word
+        self.shown_ref_count = 0
+        # Clearing scrolls back to the top, which would load a page of its own
+        with QSignalBlocker(self.references.verticalScrollBar()):
+            self.references.clear()
+        self.show_more_refs()
+
+    def show_more_refs(self) -> None:
+        """Add the next page of references to the end of the display."""
+        refs_html = self.refs_html.get(self.shown_word, [])
+        if self.shown_ref_count >= len(refs_html):
+            return
+        page = refs_html[self.shown_ref_count : self.shown_ref_count + REFS_PAGE_SIZE]
+        cursor = QTextCursor(self.references.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        if self.shown_ref_count:
+            # Start a new block, or the page's first heading would be run into
+            # the last paragraph
+            cursor.insertBlock()
+        cursor.insertHtml("".join(page))
+        self.shown_ref_count += len(page)
+
+    def on_references_scrolled(self, value: int) -> None:
+        """When the user scrolls the references, add more as they near the end."""
+        scroll_bar = self.references.verticalScrollBar()
+        if value >= scroll_bar.maximum() - scroll_bar.pageStep():
+            self.show_more_refs()
 
     def on_worker_progress_update(self, percent_complete: int, message: str) -> None:
         """Updates status bar with progress."""
@@ -373,42 +571,86 @@ class MainWindow(QMainWindow):
             return
 
         # Launch worker
-        worker = Worker(self.worker_push_to_server, self.path)
+        # The push gets its own copy of the files to stage, and fixes made
+        # while it runs start a new set for the next push.  The copy is put
+        # back unless the push succeeds.
+        dirty_paths = frozenset(self.dirty_paths)
+        self.dirty_paths.clear()
+        worker = Worker(
+            self.worker_push_to_server, repo_dir=self.path, dirty_paths=dirty_paths
+        )
         worker.signals.progress.connect(self.on_worker_progress_update)
-        worker.signals.error.connect(self.on_worker_error)
-        self.threadpool.start(worker)
-
-    def worker_export_wordlist(self, *args: Any, **kwargs: Any) -> None:
-        # pylint: disable=unused-argument
+        worker.signals.result.connect(partial(self.on_push_complete, dirty_paths))
+        worker.signals.error.connect(partial(self.on_push_error, dirty_paths))
+        worker.signals.finished.connect(self.on_push_finished)
+
+        # One push at a time, so a second push doesn't start with an empty set
+        # of files and stage the whole tree, or share the repo's index
+        self.push_changes_button.setEnabled(False)
+        self.io_pool.start(worker)
+
+    def on_push_complete(self, dirty_paths: frozenset[Path], pushed: bool) -> None:
+        """Called back on the main thread after a push ends without raising."""
+        # The push failed or was rejected after committing, so stage the files
+        # again next time rather than falling back on staging the whole tree
+        if not pushed:
+            self.dirty_paths.update(dirty_paths)
+
+    def on_push_error(
+        self, dirty_paths: frozenset[Path], error: Tuple[Any, Any, Any]
+    ) -> None:
+        """Called back on the main thread if a push fails, perhaps before its
+        files were committed."""
+        # Staging them again next time is harmless if they were committed
+        self.dirty_paths.update(dirty_paths)
+        self.on_worker_error(error)
+
+    def on_push_finished(self) -> None:
+        """Called back on the main thread after a push ends, even on error."""
+        self.push_changes_button.setEnabled(True)
+
+    def worker_export_wordlist(self, *, progress_callback: Any) -> None:
         """Export word list to disk."""
-        progress_callback = kwargs["progress_callback"]
         progress_callback.emit(0, "Exporting word list, please wait...")
         filename = "word_list.csv"
-        with open(filename, "w", encoding="utf-8") as outfile:
-            outfile.write("Word,Count\n")
-            for word in sorted(self.word_entries.keys()):
-                word_entry = self.word_entries[word]
-                outfile.write(f"{word_entry.word},{len(word_entry.refs)}\n")
+        # Words are unique, so sorting the rows sorts by word alone
+        rows = sorted(
+            (word, len(entry.refs)) for word, entry in self.word_entries.items()
+        )
+        with open(filename, "w", encoding="utf-8", newline="") as outfile:
+            writer = csv.writer(outfile, lineterminator="\n")
+            writer.writerow(["Word", "Count"])
+            writer.writerows(rows)
         progress_callback.emit(100, f"Done. Word list exported to {filename}")
 
-    def worker_parse_usfm(self, *args: Any, **kwargs: Any) -> dict[str, WordEntry]:
-        # pylint: disable=unused-argument
+    def worker_parse_usfm(
+        self, path: Path, *, progress_callback: Any
+    ) -> dict[str, WordEntry]:
         """Analyze USFM."""
-        return analyzer.process_file_or_dir(self.path)
+        return analyzer.process_file_or_dir(path, ThrottledProgress(progress_callback))
 
-    def worker_push_to_server(self, *args: Any, **kwargs: Any) -> None:
-        # pylint: disable=unused-argument
-        """Push changes to the server."""
+    def worker_push_to_server(
+        self, repo_dir: Path, dirty_paths: frozenset[Path], *, progress_callback: Any
+    ) -> bool:
+        """Push changes to the server, returning whether the push succeeded."""
 
-        # Setup
-        progress_callback = kwargs["progress_callback"]
-        repo_dir = str(self.path)
-        repo = Repository(repo_dir)
+        # Setup.  The repo and the files to stage are snapshots taken when
+        # the push was started, so loading another directory or fixing more
+        # words meanwhile doesn't change them under this thread.
+        repo = Repository(str(repo_dir))
 
-        # Stage files
+        # Stage the files spelling fixes have changed.  Adding them by name
+        # avoids walking and stat-ing the rest of the working tree.
         progress_callback.emit(0, "Staging files...")
         index = repo.index
-        index.add_all()
+        if dirty_paths:
+            workdir = Path(repo.workdir).resolve()
+            for file_path in sorted(dirty_paths):
+                index.add(file_path.resolve().relative_to(workdir).as_posix())
+        else:
+            # Nothing was fixed in this session (e.g. the app was restarted
+            # since), so pick up changes from anywhere in the tree
+            index.add_all()
         index.write()
 
         # Commit files
@@ -417,7 +659,12 @@ class MainWindow(QMainWindow):
         head_ref = repo.head
         parent_commit = repo[head_ref.target]
         parents: list[str | Oid] = [parent_commit.id]
-        author = Signature(self.settings.user_name, self.settings.email)
+        if self.settings.user_name and self.settings.email:
+            author = Signature(self.settings.user_name, self.settings.email)
+        else:
+            # The user cancelled the prompts, so use git's configured identity
+            # rather than failing on an empty signature
+            author = repo.default_signature
         committer = author
         message = "Correct spelling"
         repo.create_commit("HEAD", author, committer, message, tree_oid, parents)
@@ -425,9 +672,10 @@ class MainWindow(QMainWindow):
         # Push files to server
         progress_callback.emit(66, "Pushing files to server...")
         remote_name = "origin"
-        branch_name = "master"
+        # Push whichever branch is checked out, e.g. "main" in newer repos
+        branch_name = repo.head.shorthand
         remote = repo.remotes[remote_name]
-        callbacks = RemoteCallbacks(
+        callbacks = PushCallbacks(
             credentials=UserPass(self.settings.wacs_user_id, self.wacs_password)
         )
         try:
@@ -435,9 +683,19 @@ class MainWindow(QMainWindow):
                 [f"refs/heads/{branch_name}:refs/heads/{branch_name}"],
                 callbacks=callbacks,
             )
-            logging.info("Successfully pushed %s to %s.", branch_name, remote_name)
-            progress_callback.emit(100, "Done pushing to server.")
         except GitError as git_error:
             message = f"ERROR: Failed to push to remote: {git_error}"
             logging.error(message)
             progress_callback.emit(100, message)
+            return False
+
+        # A push the server declines (e.g. a protected branch) still returns
+        # normally, so check what it said about each ref
+        if callbacks.rejections:
+            message = f"ERROR: Server rejected push: {'; '.join(callbacks.rejections)}"
+            logging.error(message)
+            progress_callback.emit(100, message)
+            return False
+        logging.info("Successfully pushed %s to %s.", branch_name, remote_name)
+        progress_callback.emit(100, "Done pushing to server.")
+        return True
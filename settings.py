@@ -32,6 +32,12 @@ def load_settings() -> Settings:
 
 def save_settings(settings: Settings) -> None:
     """Saves settings to disk"""
-    with open(SETTINGS_FILENAME, "w", encoding="utf=8") as outfile:
+    # Write a temporary file and swap it into place, so a crash partway
+    # through never leaves a truncated settings file that fails to load
+    temp_filename = f"{SETTINGS_FILENAME}.tmp"
+    with open(temp_filename, "w", encoding="utf=8") as outfile:
         json.dump(asdict(settings), outfile, indent=4)
+        outfile.flush()
+        os.fsync(outfile.fileno())
+    os.replace(temp_filename, SETTINGS_FILENAME)
     logging.debug("Wrote settings to: %s", SETTINGS_FILENAME)
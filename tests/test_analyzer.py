@@ -0,0 +1,166 @@
+""" Tests for analyzer.py """
+
+# Standard imports
+from pathlib import Path
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+
+# Third-party imports
+
+# Project imports
+import analyzer
+
+SAMPLE_USFM = """\\id GEN
+\\h Genesis
+\\toc1 The Book of Genesis
+\\c 1
+\\p
+\\v 1 In the beginning, God created the heavens and the earth.
+\\v 2 The earth was formless\\f + \\ft Or empty 2\\f* and empty.
+\\q1 the deep was dark;
+\\c 2
+\\v 1 Thus the heavens were finished—“all” of them.
+"""
+
+
+class AnalyzerTest(unittest.TestCase):
+    """Tests for analyzer.py"""
+
+    def setUp(self) -> None:
+        """Write the sample USFM to a temporary file"""
+        # pylint: disable=consider-using-with
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "01-GEN.usfm"
+        self.path.write_text(SAMPLE_USFM, encoding="utf-8")
+
+    def tearDown(self) -> None:
+        """Remove the temporary file"""
+        self.temp_dir.cleanup()
+
+    def test_process_file_words(self) -> None:
+        """Words are extracted without markers, footnotes, numbers or punctuation"""
+        word_entries = analyzer.process_file(self.path)
+        self.assertIn("beginning", word_entries)
+        self.assertIn("finished", word_entries)
+        self.assertIn("all", word_entries)
+        self.assertNotIn("v", word_entries)
+        self.assertNotIn("q1", word_entries)
+        self.assertNotIn("Or", word_entries)
+        self.assertNotIn("1", word_entries)
+        self.assertNotIn("Book", word_entries)
+
+    def test_process_file_refs(self) -> None:
+        """References are unique per verse and kept in canonical order"""
+        word_entries = analyzer.process_file(self.path)
+        refs = list(word_entries["the"].refs)
+        self.assertEqual(
+            [str(ref) for ref in refs],
+            ["Genesis 1:1", "Genesis 1:2", "Genesis 2:1"],
+        )
+        self.assertEqual(refs[0].file_path, self.path)
+        self.assertIn("In the beginning, God created", refs[0].text)
+
+    def test_process_file_text(self) -> None:
+        """Reference text has footnotes and markers removed"""
+        word_entries = analyzer.process_file(self.path)
+        ref = next(iter(word_entries["formless"].refs))
+        self.assertNotIn("\\", ref.text)
+        self.assertNotIn("empty 2", ref.text)
+        self.assertIn("The earth was formless", ref.text)
+
+    def test_process_file_unicode(self) -> None:
+        """Non-ASCII digits and punctuation are not part of words"""
+        self.path.write_text(
+            "\\h Genesis\n\\c 1\n\\v 1 ¿Señor१२ naïve—word?\n", encoding="utf-8"
+        )
+        word_entries = analyzer.process_file(self.path)
+        self.assertEqual(list(word_entries), ["Señor", "naïve", "word"])
+
+    def test_verse_reference_pickle(self) -> None:
+        """References survive a round trip to and from a worker process"""
+        ref = analyzer.VerseReference("Genesis", 1, 1, self.path, "text")
+        copy = pickle.loads(pickle.dumps(ref))
+        self.assertEqual(copy, ref)
+        self.assertEqual(hash(copy), hash(ref))
+        self.assertEqual(copy.text, "text")
+
+    def test_process_file_or_dir_merges(self) -> None:
+        """References from several files are merged into one entry per word"""
+        second_path = Path(self.temp_dir.name) / "02-EXO.usfm"
+        second_path.write_text(
+            "\\h Exodus\n\\c 1\n\\v 1 These are the names.\n", encoding="utf-8"
+        )
+        progress_callback = mock.Mock()
+        with mock.patch("os.cpu_count", return_value=1):
+            word_entries = analyzer.process_file_or_dir(
+                Path(self.temp_dir.name), progress_callback
+            )
+        self.assertEqual(
+            [str(ref) for ref in word_entries["the"].refs],
+            ["Genesis 1:1", "Genesis 1:2", "Genesis 2:1", "Exodus 1:1"],
+        )
+        self.assertEqual(
+            progress_callback.emit.call_args_list,
+            [mock.call(50, "Read 01-GEN.usfm"), mock.call(100, "Read 02-EXO.usfm")],
+        )
+
+    def test_process_file_or_dir_extensions(self) -> None:
+        """USFM files are found in subdirectories with any case of extension"""
+        (Path(self.temp_dir.name) / "nt").mkdir()
+        (Path(self.temp_dir.name) / "nt" / "41-MAT.USFM").write_text(
+            "\\h Matthew\n\\c 1\n\\v 1 The book.\n", encoding="utf-8"
+        )
+        (Path(self.temp_dir.name) / "42-MRK.Usfm").write_text(
+            "\\h Mark\n\\c 1\n\\v 1 The beginning.\n", encoding="utf-8"
+        )
+        (Path(self.temp_dir.name) / "notes.txt").write_text("Notes", encoding="utf-8")
+        word_entries = analyzer.process_file_or_dir(Path(self.temp_dir.name))
+        self.assertEqual(
+            [str(ref) for ref in word_entries["The"].refs],
+            ["Genesis 1:2", "Mark 1:1", "Matthew 1:1"],
+        )
+        self.assertNotIn("Notes", word_entries)
+
+    def test_process_file_or_dir_parallel(self) -> None:
+        """Files parsed in worker processes are merged in file order"""
+        second_path = Path(self.temp_dir.name) / "02-EXO.usfm"
+        second_path.write_text(
+            "\\h Exodus\n\\c 1\n\\v 1 These are the names.\n", encoding="utf-8"
+        )
+        progress_callback = mock.Mock()
+        with mock.patch("os.cpu_count", return_value=2):
+            word_entries = analyzer.process_file_or_dir(
+                Path(self.temp_dir.name), progress_callback
+            )
+        self.assertEqual(
+            [str(ref) for ref in word_entries["the"].refs],
+            ["Genesis 1:1", "Genesis 1:2", "Genesis 2:1", "Exodus 1:1"],
+        )
+        self.assertEqual(
+            progress_callback.emit.call_args_list,
+            [mock.call(50, "Read 01-GEN.usfm"), mock.call(100, "Read 02-EXO.usfm")],
+        )
+
+    def test_process_file_or_dir_empty(self) -> None:
+        """A directory without USFM files has no words"""
+        self.path.unlink()
+        self.assertEqual(analyzer.process_file_or_dir(Path(self.temp_dir.name)), {})
+
+    def test_process_file_non_latin(self) -> None:
+        """Words in other scripts, including combining marks, are kept whole"""
+        self.path.write_text(
+            "\\h Genesis\n\\c 1\n\\v 1 नमस्ते दुनिया, λόγος.\n", encoding="utf-8"
+        )
+        word_entries = analyzer.process_file(self.path)
+        self.assertEqual(list(word_entries), ["नमस्ते", "दुनिया", "λόγος"])
+
+    def test_whole_word_regex(self) -> None:
+        """Only whole words are matched, not parts of words or markers"""
+        word_regex = analyzer.whole_word_regex("v")
+        self.assertEqual(
+            word_regex.sub("X", "\\v 1 v vv v\\f* (v)"), "\\v 1 X vv X\\f* (X)"
+        )
+        word_regex = analyzer.whole_word_regex("नमस्ते")
+        self.assertEqual(word_regex.sub("X", "नमस्ते नमस्तेजी"), "X नमस्तेजी")
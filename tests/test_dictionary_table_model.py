@@ -0,0 +1,94 @@
+""" Tests for dictionary_table_model.py """
+
+# Standard imports
+from pathlib import Path
+from typing import Any
+import unittest
+
+# Third-party imports
+from PySide6.QtCore import Qt, QModelIndex
+
+# Project imports
+from analyzer import VerseReference, WordEntry
+from dictionary_table_model import FETCH_SIZE, DictionaryTableModel
+
+
+def make_entry(word: str, verse_count: int) -> WordEntry:
+    """Make a word entry with the given number of refs"""
+    refs = {
+        VerseReference("Genesis", 1, verse, Path("01-GEN.usfm"), word): None
+        for verse in range(1, verse_count + 1)
+    }
+    return WordEntry(word, refs)
+
+
+class DictionaryTableModelTest(unittest.TestCase):
+    """Tests for dictionary_table_model.py"""
+
+    def setUp(self) -> None:
+        """Build a small model"""
+        self.model = DictionaryTableModel(
+            {
+                "beta": make_entry("beta", 2),
+                "alpha": make_entry("alpha", 1),
+                "gamma": make_entry("gamma", 3),
+            }
+        )
+
+    def column(self, column: int) -> list[Any]:
+        """Return the displayed values of a column"""
+        return [
+            self.model.index(row, column).data() for row in range(self.model.rowCount())
+        ]
+
+    def test_data(self) -> None:
+        """Rows display the word and its reference count"""
+        self.assertEqual(self.column(0), ["beta", "alpha", "gamma"])
+        self.assertEqual(self.column(1), [2, 1, 3])
+
+    def test_sort(self) -> None:
+        """Sorting reorders rows by either column"""
+        self.model.sort(1, Qt.SortOrder.DescendingOrder)
+        self.assertEqual(self.column(0), ["gamma", "beta", "alpha"])
+        self.model.sort(0, Qt.SortOrder.AscendingOrder)
+        self.assertEqual(self.column(0), ["alpha", "beta", "gamma"])
+
+    def test_set_data(self) -> None:
+        """Replacing the data resets the rows in place"""
+        self.model.set_data({"delta": make_entry("delta", 4)})
+        self.assertEqual(self.column(0), ["delta"])
+        self.assertEqual(self.column(1), [4])
+
+    def test_set_data_keeps_sort(self) -> None:
+        """Replacing the data re-applies the current sort"""
+        self.model.sort(1, Qt.SortOrder.DescendingOrder)
+        self.model.set_data(
+            {"delta": make_entry("delta", 1), "epsilon": make_entry("epsilon", 2)}
+        )
+        self.assertEqual(self.column(0), ["epsilon", "delta"])
+
+    def test_sort_is_stable(self) -> None:
+        """Rows with the same count keep their previous relative order"""
+        self.model.set_data(
+            {
+                "delta": make_entry("delta", 1),
+                "alpha": make_entry("alpha", 2),
+                "gamma": make_entry("gamma", 1),
+                "beta": make_entry("beta", 2),
+            }
+        )
+        self.model.sort(0, Qt.SortOrder.AscendingOrder)
+        self.model.sort(1, Qt.SortOrder.DescendingOrder)
+        self.assertEqual(self.column(0), ["alpha", "beta", "delta", "gamma"])
+
+    def test_fetch_more(self) -> None:
+        """Large word lists are handed to the view a page at a time"""
+        words = [f"word{number:04}" for number in range(FETCH_SIZE * 2 + 1)]
+        self.model.set_data({word: make_entry(word, 1) for word in words})
+        self.assertEqual(self.model.rowCount(), FETCH_SIZE)
+        self.assertTrue(self.model.canFetchMore(QModelIndex()))
+        self.model.fetchMore(QModelIndex())
+        self.assertEqual(self.model.rowCount(), FETCH_SIZE * 2)
+        self.model.fetch_all()
+        self.assertEqual(self.column(0), words)
+        self.assertFalse(self.model.canFetchMore(QModelIndex()))
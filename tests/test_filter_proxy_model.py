@@ -0,0 +1,58 @@
+""" Tests for filter_proxy_model.py """
+
+# Standard imports
+import unittest
+
+# Third-party imports
+from PySide6.QtCore import Qt, QPersistentModelIndex
+
+# Project imports
+from dictionary_table_model import FETCH_SIZE, DictionaryTableModel
+from filter_proxy_model import FilterProxyModel
+from tests.test_dictionary_table_model import make_entry
+
+
+class FilterProxyModelTest(unittest.TestCase):
+    """Tests for filter_proxy_model.py"""
+
+    def setUp(self) -> None:
+        """Filter more words than the table fetches at once"""
+        words = [f"word{number:04}" for number in range(FETCH_SIZE * 2)]
+        words += ["Alpha", "alphabet", "beta"]
+        self.source_model = DictionaryTableModel(
+            {word: make_entry(word, 1) for word in words}
+        )
+        self.model = FilterProxyModel()
+        self.model.setSourceModel(self.source_model)
+
+    def words(self) -> list[str]:
+        """Return the words that pass the filter"""
+        return [self.model.index(row, 0).data() for row in range(self.model.rowCount())]
+
+    def test_filter(self) -> None:
+        """Words containing the filter text pass, ignoring case, even if they
+        haven't been fetched yet"""
+        self.model.set_filter_text("ALPH")
+        self.assertEqual(self.words(), ["Alpha", "alphabet"])
+        self.model.set_filter_text("Bet")
+        self.assertEqual(self.words(), ["alphabet", "beta"])
+
+    def test_clear_filter(self) -> None:
+        """Clearing the filter shows all fetched words again"""
+        self.model.set_filter_text("beta")
+        self.model.set_filter_text("")
+        self.assertEqual(self.model.rowCount(), self.source_model.rowCount())
+
+    def test_sort_keeps_persistent_index(self) -> None:
+        """A selected word that sorts past the fetched rows stays selected, with
+        its row fetched before the layout changes"""
+        selected = QPersistentModelIndex(self.model.index(0, 0))
+        self.assertEqual(selected.data(), "word0000")
+        row_counts = []
+        self.source_model.layoutAboutToBeChanged.connect(
+            lambda: row_counts.append(self.source_model.rowCount())
+        )
+        self.model.sort(0, Qt.SortOrder.DescendingOrder)
+        self.assertEqual(selected.data(), "word0000")
+        self.assertEqual(selected.row(), FETCH_SIZE * 2 - 1)
+        self.assertEqual(row_counts, [FETCH_SIZE * 2])
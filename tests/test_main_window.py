@@ -0,0 +1,397 @@
+""" Tests for main_window.py """
+
+# Standard imports
+from pathlib import Path
+from typing import Any
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+# Third-party imports
+# pylint: disable=no-name-in-module
+from pygit2 import Repository, Signature, UserPass, init_repository
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtWidgets import QApplication
+
+# Project imports
+from main_window import MainWindow, PushCallbacks
+import main_window
+from settings import Settings
+import analyzer
+
+GENESIS_USFM = """\\id GEN
+\\h Genesis
+\\c 1
+\\v 1 In the beginning the other one was there.
+\\v 2 And the earth was formless.
+"""
+
+EXODUS_USFM = """\\id EXO
+\\h Exodus
+\\c 1
+\\v 1 These are the names.
+"""
+
+
+class ProgressRecorder:
+    # pylint: disable=too-few-public-methods
+    """Stands in for a worker's progress signal"""
+
+    def __init__(self) -> None:
+        self.messages: list[str] = []
+
+    def emit(self, percent_complete: int, message: str) -> None:
+        """Record a progress message"""
+        self.messages.append(f"{message} ({percent_complete}%)")
+
+
+class MainWindowTest(unittest.TestCase):
+    # pylint: disable=too-many-public-methods
+    """Tests for main_window.py"""
+
+    app: QCoreApplication
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Widgets need an application"""
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self) -> None:
+        """Load a small repo of USFM files into a window"""
+        # pylint: disable=consider-using-with
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name)
+        (self.path / "01-GEN.usfm").write_text(GENESIS_USFM, encoding="utf-8")
+        (self.path / "02-EXO.usfm").write_text(EXODUS_USFM, encoding="utf-8")
+        self.window = MainWindow(Settings(repo_dir=self.temp_dir.name))
+        self.window.word_entries = analyzer.process_file_or_dir(self.path)
+
+    def tearDown(self) -> None:
+        """Remove the temporary files"""
+        self.window.deleteLater()
+        self.temp_dir.cleanup()
+
+    def fix_spelling(self, word: str, corrected_spelling: str) -> list[str]:
+        """Run the fix spelling worker in this thread, returning its messages"""
+        progress = ProgressRecorder()
+        corrected_paths = self.window.worker_fix_spelling(
+            word=word, corrected_spelling=corrected_spelling, progress_callback=progress
+        )
+        self.window.on_fix_spelling_complete(corrected_paths)
+        return progress.messages
+
+    def test_fix_spelling(self) -> None:
+        """Each file with the word is corrected once, whole words only"""
+        messages = self.fix_spelling("the", "teh")
+        self.assertEqual(
+            messages, ["Corrected 01-GEN.usfm (50%)", "Corrected 02-EXO.usfm (100%)"]
+        )
+        self.assertEqual(
+            (self.path / "01-GEN.usfm").read_text(encoding="utf-8"),
+            GENESIS_USFM.replace(" the ", " teh "),
+        )
+        self.assertIn("teh other", (self.path / "01-GEN.usfm").read_text("utf-8"))
+
+    def test_fix_spelling_failure(self) -> None:
+        """A file that can't be corrected doesn't stop the files after it"""
+        (self.path / "03-LEV.usfm").write_text(
+            "\\h Leviticus\n\\c 1\n\\v 1 Then the voice.\n", encoding="utf-8"
+        )
+        self.window.word_entries = analyzer.process_file_or_dir(self.path)
+
+        real_correct_file = main_window.correct_file
+
+        def correct_file(file_path: Path, **kwargs: Any) -> bool:
+            if file_path.name == "02-EXO.usfm":
+                raise PermissionError("Permission denied")
+            return real_correct_file(file_path, **kwargs)
+
+        with mock.patch("main_window.correct_file", side_effect=correct_file):
+            with self.assertLogs(level="ERROR"):
+                messages = self.fix_spelling("the", "teh")
+        self.assertIn(
+            "Failed to correct 02-EXO.usfm: Permission denied (66%)", messages
+        )
+        self.assertIn("Corrected 03-LEV.usfm (100%)", messages)
+        self.assertEqual(messages[-1], "ERROR: Failed to correct 02-EXO.usfm (100%)")
+        self.assertIn("teh voice", (self.path / "03-LEV.usfm").read_text("utf-8"))
+
+        # Files corrected before and after the failure are still marked dirty
+        self.assertEqual(
+            self.window.dirty_paths,
+            {self.path / "01-GEN.usfm", self.path / "03-LEV.usfm"},
+        )
+
+    def test_fix_spelling_unchanged(self) -> None:
+        """Files with nothing left to correct are not rewritten"""
+        self.fix_spelling("formless", "shapeless")
+        messages = self.fix_spelling("formless", "shapeless")
+        self.assertEqual(messages, ["Nothing to correct in 01-GEN.usfm (100%)"])
+
+    def test_export_wordlist(self) -> None:
+        """The word list is exported sorted by word, with counts"""
+        working_dir = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        try:
+            self.window.worker_export_wordlist(progress_callback=ProgressRecorder())
+        finally:
+            os.chdir(working_dir)
+        lines = (self.path / "word_list.csv").read_text(encoding="utf-8").splitlines()
+        self.assertEqual(lines[0], "Word,Count")
+        self.assertEqual(lines[1:4], ["And,1", "In,1", "These,1"])
+        self.assertIn("the,3", lines)
+
+    def test_load_keeps_models(self) -> None:
+        """Loading USFM refills the view's models rather than replacing them"""
+        selection_model = self.window.table_view.selectionModel()
+        self.window.on_load_usfm_complete(self.window.word_entries)
+        self.window.on_load_usfm_complete(analyzer.process_file_or_dir(self.path))
+        self.assertIs(self.window.table_view.model(), self.window.proxy_table_model)
+        self.assertIs(self.window.table_view.selectionModel(), selection_model)
+        self.assertEqual(self.window.proxy_table_model.rowCount(), 13)
+        self.assertEqual(self.window.table_view.model().index(0, 0).data(), "the")
+
+    def test_fix_spelling_progress(self) -> None:
+        """Progress is reported once per percent (0-100), however many files"""
+        for number in range(3, 251):
+            (self.path / f"{number:03}-EXO.usfm").write_text(
+                EXODUS_USFM.replace("\\c 1", f"\\c {number}"), encoding="utf-8"
+            )
+        self.window.word_entries = analyzer.process_file_or_dir(self.path)
+        messages = self.fix_spelling("names", "titles")
+        self.assertEqual(len(messages), 101)
+        self.assertEqual(messages[-1], "Corrected 250-EXO.usfm (100%)")
+
+    def push_changes(self, wait: bool = True) -> None:
+        """Push from the window, by default waiting for the worker to finish"""
+        self.window.settings.user_name = "Test"
+        self.window.settings.email = "test@example.org"
+        self.window.settings.wacs_user_id = "test"
+        self.window.wacs_password = "password"
+        self.window.push_changes_button.click()
+        if wait:
+            self.window.io_pool.waitForDone()
+            QApplication.processEvents()
+
+    def init_repo(self) -> Repository:
+        """Commit the USFM files to a new repo"""
+        repo = init_repository(self.temp_dir.name, initial_head="main")
+        repo.index.add_all()
+        repo.index.write()
+        author = Signature("Test", "test@example.org")
+        repo.create_commit(
+            "HEAD", author, author, "Initial", repo.index.write_tree(), []
+        )
+        return repo
+
+    def test_push_changes(self) -> None:
+        """Only the files corrected in this session are committed and pushed"""
+        repo = self.init_repo()
+        with tempfile.TemporaryDirectory() as remote_dir:
+            remote = init_repository(remote_dir, bare=True)
+            repo.remotes.create("origin", remote_dir)
+            (self.path / "notes.txt").write_text("Not for the server", encoding="utf-8")
+            self.fix_spelling("formless", "shapeless")
+            self.push_changes()
+
+            self.assertIn(
+                b"shapeless", remote.revparse_single("main:01-GEN.usfm").read_raw()
+            )
+            with self.assertRaises(KeyError):
+                remote.revparse_single("main:notes.txt")
+        self.assertEqual(self.window.dirty_paths, set())
+
+    def test_push_changes_clicked(self) -> None:
+        """Push changes is disabled while a push is running"""
+        repo = self.init_repo()
+        with tempfile.TemporaryDirectory() as remote_dir:
+            init_repository(remote_dir, bare=True)
+            repo.remotes.create("origin", remote_dir)
+            self.fix_spelling("formless", "shapeless")
+            with mock.patch.object(
+                self.window.io_pool, "start", wraps=self.window.io_pool.start
+            ) as start:
+                self.push_changes(wait=False)
+                self.assertFalse(self.window.push_changes_button.isEnabled())
+                self.window.push_changes_button.click()
+                self.window.io_pool.waitForDone()
+                QApplication.processEvents()
+            self.assertEqual(start.call_count, 1)
+        self.assertTrue(self.window.push_changes_button.isEnabled())
+        self.assertEqual(self.window.dirty_paths, set())
+
+    def test_push_default_signature(self) -> None:
+        """Without a name and email in settings, git's configured identity is used"""
+        repo = init_repository(self.temp_dir.name, initial_head="main")
+        repo.config["user.name"] = "Configured"
+        repo.config["user.email"] = "configured@example.org"
+        repo.create_commit(
+            "HEAD",
+            repo.default_signature,
+            repo.default_signature,
+            "Initial",
+            repo.index.write_tree(),
+            [],
+        )
+        # There's no remote, but the commit is made before pushing
+        with self.assertRaises(KeyError):
+            self.window.worker_push_to_server(
+                self.path, frozenset(), progress_callback=ProgressRecorder()
+            )
+        commit = repo.revparse_single("HEAD").read_raw()
+        self.assertIn(b"author Configured <configured@example.org>", commit)
+        self.assertIn(b"Correct spelling", commit)
+
+    def test_push_error(self) -> None:
+        """Files stay dirty if a push fails before committing them"""
+        self.fix_spelling("formless", "shapeless")
+        with self.assertLogs(level="ERROR"):
+            self.push_changes()
+        self.assertEqual(self.window.dirty_paths, {self.path / "01-GEN.usfm"})
+
+    def test_push_retry(self) -> None:
+        """Files stay dirty if pushing a commit fails, so a retry stages only them"""
+        repo = self.init_repo()
+        with tempfile.TemporaryDirectory() as remote_dir:
+            repo.remotes.create("origin", str(Path(remote_dir) / "missing"))
+            (self.path / "notes.txt").write_text("Not for the server", encoding="utf-8")
+            self.fix_spelling("formless", "shapeless")
+            with self.assertLogs(level="ERROR"):
+                self.push_changes()
+            self.assertEqual(self.window.dirty_paths, {self.path / "01-GEN.usfm"})
+
+            remote = init_repository(remote_dir, bare=True)
+            repo.remotes.set_url("origin", remote_dir)
+            self.push_changes()
+            self.assertIn(
+                b"shapeless", remote.revparse_single("main:01-GEN.usfm").read_raw()
+            )
+            with self.assertRaises(KeyError):
+                remote.revparse_single("main:notes.txt")
+        self.assertEqual(self.window.dirty_paths, set())
+
+    def test_push_rejections(self) -> None:
+        """Refs the server declines are recorded, so the push isn't reported done"""
+        callbacks = PushCallbacks(credentials=UserPass("user", "password"))
+        callbacks.push_update_reference("refs/heads/main", None)
+        callbacks.push_update_reference("refs/heads/main", "pre-receive hook declined")
+        self.assertEqual(
+            callbacks.rejections, ["refs/heads/main: pre-receive hook declined"]
+        )
+
+    def test_table_cell_clicked(self) -> None:
+        """Clicking a filtered row shows the references of its word"""
+        self.window.on_load_usfm_complete(self.window.word_entries)
+        self.window.proxy_table_model.set_filter_text("FOR")
+        self.window.on_table_cell_clicked(self.window.proxy_table_model.index(0, 1))
+        self.assertEqual(self.window.shown_word, "formless")
+        self.assertIn("Genesis 1:2", self.window.references.toPlainText())
+
+    def test_table_selects_rows(self) -> None:
+        """Selecting a cell selects the whole row of its word"""
+        self.window.on_load_usfm_complete(self.window.word_entries)
+        self.window.table_view.setCurrentIndex(
+            self.window.proxy_table_model.index(0, 1)
+        )
+        selected_indexes = self.window.table_view.selectionModel().selectedIndexes()
+        self.assertEqual(sorted(index.column() for index in selected_indexes), [0, 1])
+
+    def test_fix_spelling_clicked(self) -> None:
+        """Fix Spelling is disabled while the selected word is corrected"""
+        self.window.on_load_usfm_complete(self.window.word_entries)
+        self.window.proxy_table_model.set_filter_text("formless")
+        self.window.table_view.selectRow(0)
+        with mock.patch(
+            "main_window.QInputDialog.getText", return_value=("shapeless", True)
+        ):
+            self.window.on_fix_spelling_clicked()
+        self.assertFalse(self.window.fix_spelling_button.isEnabled())
+        self.assertIn("shapeless", self.window.references.toPlainText())
+
+        self.window.threadpool.waitForDone()
+        QApplication.processEvents()
+        self.assertTrue(self.window.fix_spelling_button.isEnabled())
+        self.assertIn("shapeless", (self.path / "01-GEN.usfm").read_text("utf-8"))
+        self.assertEqual(self.window.dirty_paths, {self.path / "01-GEN.usfm"})
+
+    def test_build_refs(self) -> None:
+        """References highlight whole words only"""
+        self.window.build_refs(self.window.word_entries["the"])
+        html = "".join(self.window.refs_html["the"])
+        self.assertIn("<font color='red'>the</font> other", html)
+        self.assertEqual(html.count("<font"), 4)
+
+    def test_build_refs_escapes_text(self) -> None:
+        """Reference text is escaped, without highlighting inside entities"""
+        ref = analyzer.VerseReference(
+            "Genesis", 1, 1, self.path / "01-GEN.usfm", "amp < amp & amps\n"
+        )
+        self.window.build_refs(analyzer.WordEntry("amp", {ref: None}))
+        html = "".join(self.window.refs_html["amp"])
+        self.assertIn(
+            "<font color='red'>amp</font> &lt; <font color='red'>amp</font> &amp; amps",
+            html,
+        )
+        self.assertIn("amp < amp & amps", self.window.references.toPlainText())
+
+    def test_show_more_refs(self) -> None:
+        """References are shown a page at a time"""
+        with mock.patch("main_window.REFS_PAGE_SIZE", 2):
+            self.window.build_refs(self.window.word_entries["the"])
+            self.assertEqual(self.window.shown_ref_count, 2)
+            self.assertNotIn("Exodus", self.window.references.toPlainText())
+            self.window.show_more_refs()
+            self.window.show_more_refs()
+        self.assertEqual(self.window.shown_ref_count, 3)
+        self.assertEqual(self.window.references.document().availableUndoSteps(), 0)
+        lines = self.window.references.toPlainText().splitlines()
+        self.assertEqual(
+            [line.strip() for line in lines[4:6]],
+            ["Exodus 1:1", "These are the names."],
+        )
+
+    def test_show_more_refs_rebuilt(self) -> None:
+        """Rebuilding scrolled references shows only their first page"""
+        with mock.patch("main_window.REFS_PAGE_SIZE", 1):
+            self.window.build_refs(self.window.word_entries["the"])
+            scroll_bar = self.window.references.verticalScrollBar()
+            # Scroll to the end of a short page, so that even the top is near it
+            scroll_bar.setRange(0, 5)
+            scroll_bar.setPageStep(10)
+            scroll_bar.setValue(5)
+            self.assertEqual(self.window.shown_ref_count, 2)
+            self.window.build_refs(self.window.word_entries["the"])
+        self.assertEqual(self.window.shown_ref_count, 1)
+
+    def test_load_usfm_clicked(self) -> None:
+        """Load USFM is disabled while the chosen directory is parsed"""
+        with mock.patch("main_window.QFileDialog") as dialog_class:
+            dialog_class.return_value.exec.return_value = True
+            dialog_class.return_value.selectedFiles.return_value = [self.temp_dir.name]
+            self.window.on_load_usfm_clicked()
+        self.assertFalse(self.window.load_usfm_button.isEnabled())
+
+        self.window.io_pool.waitForDone()
+        QApplication.processEvents()
+        self.assertTrue(self.window.load_usfm_button.isEnabled())
+        self.assertEqual(self.window.table_model.rowCount(), 13)
+
+    def test_refs_html_cache(self) -> None:
+        """Cached references are evicted, and refreshed by spelling fixes"""
+        with mock.patch("main_window.REFS_CACHE_SIZE", 1):
+            self.window.build_refs(self.window.word_entries["formless"])
+            self.window.build_refs(self.window.word_entries["the"])
+        self.assertEqual(list(self.window.refs_html), ["the"])
+
+        self.window.on_load_usfm_complete(self.window.word_entries)
+        self.window.build_refs(self.window.word_entries["the"])
+        self.window.proxy_table_model.set_filter_text("formless")
+        self.window.table_view.selectRow(0)
+        with mock.patch(
+            "main_window.QInputDialog.getText", return_value=("shapeless", True)
+        ):
+            self.window.on_fix_spelling_clicked()
+        self.window.threadpool.waitForDone()
+        self.window.build_refs(self.window.word_entries["the"])
+        self.assertIn("shapeless", "".join(self.window.refs_html["the"]))
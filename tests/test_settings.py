@@ -0,0 +1,36 @@
+""" Tests for settings.py """
+
+# Standard imports
+import os
+import tempfile
+import unittest
+
+# Third-party imports
+
+# Project imports
+import settings
+
+
+class SettingsTest(unittest.TestCase):
+    """Tests for settings.py"""
+
+    def setUp(self) -> None:
+        """Work in an empty directory"""
+        # pylint: disable=consider-using-with
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.working_dir = os.getcwd()
+        os.chdir(self.temp_dir.name)
+
+    def tearDown(self) -> None:
+        """Remove the temporary files"""
+        os.chdir(self.working_dir)
+        self.temp_dir.cleanup()
+
+    def test_save_settings(self) -> None:
+        """Saved settings load back, and replace the file in one step"""
+        settings.save_settings(settings.Settings(user_name="Test", repo_dir="/usfm"))
+        settings.save_settings(settings.Settings(user_name="Test 2"))
+        self.assertEqual(
+            settings.load_settings(), settings.Settings(user_name="Test 2")
+        )
+        self.assertEqual(os.listdir(), [settings.SETTINGS_FILENAME])
@@ -0,0 +1,83 @@
+""" Tests for worker.py """
+
+# Standard imports
+from typing import Any
+import unittest
+from unittest import mock
+
+# Third-party imports
+
+# Project imports
+from worker import ThrottledProgress, Worker
+
+
+class ThrottledProgressTest(unittest.TestCase):
+    """Tests for worker.py"""
+
+    def test_emit(self) -> None:
+        """Only messages that change the percentage are passed on"""
+        progress_callback = mock.Mock()
+        progress = ThrottledProgress(progress_callback)
+        progress.emit(0, "Starting")
+        progress.emit(0, "Still starting")
+        progress.emit(50, "Halfway")
+        progress.emit(100, "Done")
+        self.assertEqual(
+            progress_callback.emit.call_args_list,
+            [
+                mock.call(0, "Starting"),
+                mock.call(50, "Halfway"),
+                mock.call(100, "Done"),
+            ],
+        )
+
+
+class WorkerTest(unittest.TestCase):
+    """Tests for worker.py"""
+
+    def run_worker(self, worker: Worker) -> list[Any]:
+        """Run a worker in this thread, returning its results"""
+        results: list[Any] = []
+        worker.signals.result.connect(results.append)
+        worker.run()
+        return results
+
+    def test_progress_callback(self) -> None:
+        """Functions that take a progress callback are given the progress signal"""
+
+        def double(number: int, *, progress_callback: Any) -> int:
+            progress_callback.emit(100, "Doubled")
+            return number * 2
+
+        worker = Worker(double, 2)
+        messages: list[str] = []
+        worker.signals.progress.connect(
+            lambda percent, message: messages.append(message)
+        )
+        self.assertEqual(self.run_worker(worker), [4])
+        self.assertEqual(messages, ["Doubled"])
+
+    def test_no_progress_callback(self) -> None:
+        """Functions without a progress callback are called with their own arguments"""
+        self.assertEqual(self.run_worker(Worker(abs, -2)), [2])
+
+    def test_error(self) -> None:
+        """Exceptions are reported with their traceback, then finished is sent"""
+
+        def parse(text: str) -> int:
+            return int(text)
+
+        worker = Worker(parse, "one")
+        errors: list[tuple[Any, Any, Any]] = []
+        finished: list[bool] = []
+        worker.signals.error.connect(errors.append)
+        worker.signals.finished.connect(lambda: finished.append(True))
+        with mock.patch("sys.stderr") as stderr:
+            self.assertEqual(self.run_worker(worker), [])
+        self.assertEqual(len(errors), 1)
+        exctype, value, formatted_traceback = errors[0]
+        self.assertIs(exctype, ValueError)
+        self.assertIsInstance(value, ValueError)
+        self.assertIn("ValueError", formatted_traceback)
+        stderr.write.assert_called_once_with(formatted_traceback)
+        self.assertEqual(finished, [True])
@@ -5,6 +5,7 @@ https://www.pythonguis.com/tutorials/multithreading-pyside6-applications-qthread
 
 # Standard imports
 from typing import Any, Callable
+import inspect
 import sys
 import traceback
 
@@ -41,6 +42,33 @@ class WorkerSignals(QObject):
     progress = Signal(int, str)
 
 
+class ThrottledProgress:
+    """
+    Wraps a worker's progress signal, passing on only messages that move the
+    percentage.
+
+    Every emit from a worker thread is queued to the main thread and wakes it
+    to repaint the status bar, so a worker reporting per file (or per object
+    pushed) would otherwise flood it.  This bounds a task to 101 updates,
+    however many items it works through.
+
+    :param progress_callback: The signal (or anything with an emit method) to
+                              pass progress on to
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, progress_callback: Any) -> None:
+        self.progress_callback = progress_callback
+        self.last_percent_complete = -1
+
+    def emit(self, percent_complete: int, message: str) -> None:
+        """Pass on progress if the percentage has changed since the last message"""
+        if percent_complete != self.last_percent_complete:
+            self.progress_callback.emit(percent_complete, message)
+            self.last_percent_complete = percent_complete
+
+
 class Worker(QRunnable):
     """
     Worker thread
@@ -48,14 +76,15 @@ class Worker(QRunnable):
     Inherits from QRunnable to handler worker thread setup, signals and wrap-up.
 
     :param callback: The function callback to run on this worker thread. Supplied args and
-                     kwargs will be passed through to the runner.
+                     kwargs will be passed through to the runner.  If it has a
+                     progress_callback parameter, the progress signal is passed in it.
     :type callback: function
     :param args: Arguments to pass to the callback function
     :param kwargs: Keywords to pass to the callback function
 
     """
 
-    def __init__(self, fn: Callable[[Any], Any], *args: Any, **kwargs: Any) -> None:
+    def __init__(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
         super().__init__()
 
         # Store constructor arguments (re-used for processing)
@@ -64,8 +93,9 @@ class Worker(QRunnable):
         self.kwargs = kwargs
         self.signals = WorkerSignals()
 
-        # Add the callback to our kwargs
-        self.kwargs["progress_callback"] = self.signals.progress
+        # Add the callback to our kwargs, if the function reports progress
+        if "progress_callback" in inspect.signature(fn).parameters:
+            self.kwargs["progress_callback"] = self.signals.progress
 
     @Slot()
     def run(self) -> None:
@@ -76,10 +106,12 @@ class Worker(QRunnable):
         # Retrieve args/kwargs here; and fire processing using them
         try:
             result = self.fn(*self.args, **self.kwargs)
-        except:  # pylint: disable=bare-except
-            traceback.print_exc()
-            exctype, value = sys.exc_info()[:2]
-            self.signals.error.emit((exctype, value, traceback.format_exc()))
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # Format the traceback once, for stderr and for the error signal.
+            # KeyboardInterrupt and SystemExit aren't errors to report here.
+            formatted_traceback = traceback.format_exc()
+            sys.stderr.write(formatted_traceback)
+            self.signals.error.emit((type(error), error, formatted_traceback))
         else:
             self.signals.result.emit(result)  # Return the result of the processing
         finally: